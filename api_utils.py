@@ -1,10 +1,31 @@
 import time
 import json
+import re
 from functools import wraps
-import google.generativeai as genai
-from config import GEMINI_API_KEY, MIN_DELAY_BETWEEN_REQUESTS, MAX_RETRIES, RETRY_DELAY
+from config import GEMINI_API_KEY, LLM_BACKEND, MIN_DELAY_BETWEEN_REQUESTS, MAX_RETRIES, RETRY_DELAY
 
-genai.configure(api_key=GEMINI_API_KEY)
+if LLM_BACKEND == "gemini":
+    import google.generativeai as genai
+    genai.configure(api_key=GEMINI_API_KEY)
+else:
+    from fake_backend import fake_generate_content
+
+CODE_FENCE = re.compile(r'```[a-zA-Z]*\s*\n?(.*?)```', re.S)
+
+# Optional shared limiter (see worker_queue.QuotaCoordinator); replaces the fixed delay
+_rate_limiter = None
+
+def set_rate_limiter(limiter):
+    """
+    Route every API call through limiter.acquire(model_name, tokens), then report
+    the response size with limiter.record_response(event_id, tokens)
+    """
+    global _rate_limiter
+    _rate_limiter = limiter
+
+def estimate_tokens(text):
+    """Rough token estimate (~4 characters per token)"""
+    return len(text) // 4
 
 def retry_with_backoff(max_retries=MAX_RETRIES, initial_delay=RETRY_DELAY):
     """
@@ -20,7 +41,8 @@ def retry_with_backoff(max_retries=MAX_RETRIES, initial_delay=RETRY_DELAY):
                     # Rate limit to prevent hitting quota
                     if attempt > 0:
                         print(f"Retry attempt {attempt}/{max_retries} after {delay}s delay...")
-                    time.sleep(MIN_DELAY_BETWEEN_REQUESTS)
+                    if _rate_limiter is None:
+                        time.sleep(MIN_DELAY_BETWEEN_REQUESTS)
                     
                     return func(*args, **kwargs)
                     
@@ -38,26 +60,51 @@ def retry_with_backoff(max_retries=MAX_RETRIES, initial_delay=RETRY_DELAY):
     return decorator
 
 @retry_with_backoff()
-def generate_content(model_name, prompt, system_instruction="", temperature=0.7):
+def generate_content(model_name, prompt, system_instruction="", temperature=0.7, step=None):
     """
-    Generate content using Gemini API with retry logic
+    Generate content using Gemini API with retry logic.
+    step names the calling pipeline step and selects the fake backend's response.
     """
-    model = genai.GenerativeModel(model_name, 
-                                 generation_config={"temperature": temperature})
-    
     complete_prompt = system_instruction + "\n\n" + prompt if system_instruction else prompt
     
-    response = model.generate_content([
-        {"role": "user", "parts": [complete_prompt]}
-    ])
+    event_id = None
+    if _rate_limiter is not None:
+        event_id = _rate_limiter.acquire(model_name, estimate_tokens(complete_prompt))
+    
+    if LLM_BACKEND == "fake":
+        text = fake_generate_content(step, complete_prompt)
+    else:
+        model = genai.GenerativeModel(model_name, 
+                                     generation_config={"temperature": temperature})
+        
+        response = model.generate_content([
+            {"role": "user", "parts": [complete_prompt]}
+        ])
+        text = response.text
     
-    return response.text
+    if event_id is not None:
+        _rate_limiter.record_response(event_id, estimate_tokens(text))
+    
+    return text
 
 def parse_json_response(text):
     """
-    Parse JSON from response text or return formatted error
+    Parse JSON from response text or return formatted error.
+    Models often add prose around the JSON or wrap it in ```json ... ``` fences, so try
+    the whole text, then the first fenced block, then the outermost {...} or [...].
     """
-    try:
-        return json.loads(text)
-    except json.JSONDecodeError:
-        return {"raw_response": text}
+    candidates = [text]
+    fenced = CODE_FENCE.search(text)
+    if fenced:
+        candidates.append(fenced.group(1))
+    for open_char, close_char in (("{", "}"), ("[", "]")):
+        start, end = text.find(open_char), text.rfind(close_char)
+        if start != -1 and end > start:
+            candidates.append(text[start:end + 1])
+    
+    for candidate in candidates:
+        try:
+            return json.loads(candidate)
+        except json.JSONDecodeError:
+            continue
+    return {"raw_response": text}
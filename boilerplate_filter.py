@@ -0,0 +1,329 @@
+import argparse
+import hashlib
+import json
+import os
+import operator
+import re
+import sqlite3
+import struct
+import sys
+from api_utils import estimate_tokens
+from config import (BOILERPLATE_INDEX_PATH, BOILERPLATE_MIN_DOCS, BOILERPLATE_MIN_WORDS,
+                    BOILERPLATE_DUPLICATE_SIMILARITY)
+
+SENTENCE_SPLIT = re.compile(r'(?<=[.!?])\s+(?=[A-Z0-9"\'(])')
+NON_WORD = re.compile(r'[^a-z0-9]+')
+DIGIT = re.compile(r'\d')
+REQUIREMENT_HEADING = re.compile(r'responsibilit|qualification|requirement|what you.ll do|what you will do|skills|experience', re.I)
+SECTION_HEADING = re.compile(r'about|overview|benefits|perks|compensation|salary|who we are|why join|our (company|team|mission|culture)|equal opportunity|location', re.I)
+BULLET = re.compile(r'^[-*\u2022\u25cf\u25aa]')
+# Boilerplate paragraphs often follow the last requirement list without a heading of their own
+REQUIREMENT_MAX_WORDS = 20
+
+# One-permutation MinHash over word shingles; LSH bands find candidate reposts without scanning the corpus
+SHINGLE_SIZE = 5
+NUM_BANDS = 16
+ROWS_PER_BAND = 4
+NUM_BUCKETS = NUM_BANDS * ROWS_PER_BAND
+EMPTY_BUCKET = (1 << 64) - 1
+SIGNATURE_FORMAT = f'<{NUM_BUCKETS}Q'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    doc_key TEXT PRIMARY KEY,
+    cluster TEXT NOT NULL,
+    signature BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS doc_bands (
+    band INTEGER NOT NULL,
+    hash TEXT NOT NULL,
+    cluster TEXT NOT NULL,
+    PRIMARY KEY (band, hash, cluster)
+);
+CREATE TABLE IF NOT EXISTS cluster_sentences (
+    cluster TEXT NOT NULL,
+    sentence TEXT NOT NULL,
+    PRIMARY KEY (cluster, sentence)
+);
+CREATE TABLE IF NOT EXISTS sentence_counts (
+    sentence TEXT PRIMARY KEY,
+    clusters INTEGER NOT NULL
+);
+"""
+
+def is_heading(line):
+    """
+    Short, non-bullet lines without sentence punctuation that end with ':' or name a
+    known section (e.g. "Responsibilities", "About the job") start a section.
+    """
+    if BULLET.match(line) or len(line.split()) > 6 or line.rstrip(':').endswith(('.', '!', '?')):
+        return False
+    return line.endswith(':') or bool(REQUIREMENT_HEADING.search(line) or SECTION_HEADING.search(line))
+
+def split_sentences(text):
+    """
+    Split raw job description text into lines, then sentences.
+    Returns (sentence, protected) pairs; bullet-length sentences under requirement headings are protected.
+    """
+    sentences = []
+    in_requirements = False
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        # Requirement protection lasts until the next heading, bullets don't reset it
+        if is_heading(line):
+            in_requirements = bool(REQUIREMENT_HEADING.search(line))
+        sentences.extend((s.strip(), in_requirements and len(s.split()) <= REQUIREMENT_MAX_WORDS)
+                         for s in SENTENCE_SPLIT.split(line) if s.strip())
+    return sentences
+
+def normalize(text):
+    """Lowercase and strip punctuation so formatting differences don't matter"""
+    return NON_WORD.sub(' ', text.lower()).strip()
+
+def sentence_key(sentence):
+    """Normalize a sentence and return its short hash used as index key"""
+    return hashlib.sha1(normalize(sentence).encode('utf-8')).hexdigest()[:16]
+
+def document_key(text):
+    """Hash of the whitespace-normalized document, used to avoid double counting"""
+    return hashlib.sha1(' '.join(text.split()).encode('utf-8')).hexdigest()[:16]
+
+def minhash_signature(text):
+    """
+    MinHash signature of the document's word shingles. Each shingle is hashed once and
+    kept as the minimum of its bucket (one-permutation hashing), so the cost stays linear
+    in the posting's length.
+    """
+    words = normalize(text).split()
+    signature = [EMPTY_BUCKET] * NUM_BUCKETS
+    for i in range(max(len(words) - SHINGLE_SIZE + 1, 1)):
+        shingle = ' '.join(words[i:i + SHINGLE_SIZE])
+        h = int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest(), 'big')
+        bucket, value = h % NUM_BUCKETS, h // NUM_BUCKETS
+        if value < signature[bucket]:
+            signature[bucket] = value
+    return signature
+
+def band_hashes(signature):
+    """One hash per LSH band; documents sharing any band are compared"""
+    return [
+        hashlib.sha1(','.join(map(str, signature[i * ROWS_PER_BAND:(i + 1) * ROWS_PER_BAND])).encode('utf-8')).hexdigest()[:16]
+        for i in range(NUM_BANDS)
+    ]
+
+def similarity(signature_a, signature_b):
+    """Estimated Jaccard similarity of two MinHash signatures, ignoring buckets empty in both"""
+    equal = sum(map(operator.eq, signature_a, signature_b))
+    both_empty = sum(1 for a, b in zip(signature_a, signature_b) if a == b == EMPTY_BUCKET) if EMPTY_BUCKET in signature_a else 0
+    used = len(signature_a) - both_empty
+    return (equal - both_empty) / used if used else 0
+
+class BoilerplateIndex:
+    """
+    Persisted sentence frequency index built across the JD corpus (SQLite).
+    Near-duplicate postings (e.g. the same role reposted per location) are grouped
+    into one cluster, and a sentence is counted once per cluster.
+    """
+
+    def __init__(self, path=BOILERPLATE_INDEX_PATH):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+
+    def find_cluster(self, signature):
+        """Cluster of the most similar indexed posting, if it is a near duplicate"""
+        # A cluster's id is its first document's key, whose signature stands in for the cluster
+        candidates = {}
+        for band, band_hash in enumerate(band_hashes(signature)):
+            for cluster, other in self.conn.execute(
+                    "SELECT b.cluster, d.signature FROM doc_bands b JOIN documents d ON d.doc_key = b.cluster "
+                    "WHERE b.band = ? AND b.hash = ?", (band, band_hash)):
+                candidates.setdefault(cluster, other)
+
+        best_cluster, best_score = None, 0
+        for cluster, other in candidates.items():
+            score = similarity(signature, struct.unpack(SIGNATURE_FORMAT, other))
+            if score > best_score:
+                best_cluster, best_score = cluster, score
+        return best_cluster if best_score >= BOILERPLATE_DUPLICATE_SIMILARITY else None
+
+    def add_document(self, text):
+        """Count each distinct sentence of a posting once per cluster. Returns False if already indexed"""
+        doc_key = document_key(text)
+        signature = minhash_signature(text)
+        keys = {sentence_key(s) for s, _ in split_sentences(text)}
+        if self.conn.execute("SELECT 1 FROM documents WHERE doc_key = ?", (doc_key,)).fetchone():
+            return False
+        # Look up candidates before taking the write lock so concurrent workers don't queue
+        # behind it. A repost indexed in between lands in its own cluster, which only
+        # counts its sentences once more.
+        cluster = self.find_cluster(signature) or doc_key
+
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            if self.conn.execute("SELECT 1 FROM documents WHERE doc_key = ?", (doc_key,)).fetchone():
+                self.conn.execute("ROLLBACK")
+                return False
+            self.conn.execute("INSERT INTO documents (doc_key, cluster, signature) VALUES (?, ?, ?)",
+                              (doc_key, cluster, struct.pack(SIGNATURE_FORMAT, *signature)))
+            self.conn.executemany("INSERT OR IGNORE INTO doc_bands (band, hash, cluster) VALUES (?, ?, ?)",
+                                  [(band, h, cluster) for band, h in enumerate(band_hashes(signature))])
+            for key in keys:
+                cursor = self.conn.execute(
+                    "INSERT OR IGNORE INTO cluster_sentences (cluster, sentence) VALUES (?, ?)", (cluster, key))
+                if cursor.rowcount:
+                    self.conn.execute(
+                        "INSERT INTO sentence_counts (sentence, clusters) VALUES (?, 1) "
+                        "ON CONFLICT (sentence) DO UPDATE SET clusters = clusters + 1", (key,))
+            self.conn.execute("COMMIT")
+            return True
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+
+    def is_boilerplate(self, sentence, count, protected=False, min_docs=BOILERPLATE_MIN_DOCS, min_words=BOILERPLATE_MIN_WORDS):
+        """Check whether a sentence recurs across enough other postings to be dropped"""
+        # Requirement sections, short bullets and anything mentioning numbers
+        # (years, degrees, salaries) are kept even when they repeat across postings
+        if protected or len(sentence.split()) < min_words or DIGIT.search(sentence):
+            return False
+        return count >= min_docs
+
+    def sentence_counts(self, text, keys):
+        """Number of other posting clusters each sentence key appears in"""
+        if not keys:
+            return {}
+        row = self.conn.execute("SELECT cluster FROM documents WHERE doc_key = ?", (document_key(text),)).fetchone()
+        cluster = row[0] if row else self.find_cluster(minhash_signature(text))
+
+        placeholders = ','.join('?' * len(keys))
+        counts = dict(self.conn.execute(
+            f"SELECT sentence, clusters FROM sentence_counts WHERE sentence IN ({placeholders})", keys).fetchall())
+        if cluster:
+            # Don't count the posting's own cluster as evidence of boilerplate
+            for (key,) in self.conn.execute(
+                    f"SELECT sentence FROM cluster_sentences WHERE cluster = ? AND sentence IN ({placeholders})",
+                    [cluster] + keys):
+                counts[key] -= 1
+        return counts
+
+    def strip(self, text, **kwargs):
+        """Return the job description text with boilerplate sentences removed"""
+        sentences = split_sentences(text)
+        keys = [sentence_key(s) for s, _ in sentences]
+        counts = self.sentence_counts(text, sorted(set(keys)))
+        kept = [s for (s, protected), key in zip(sentences, keys)
+                if not self.is_boilerplate(s, counts.get(key, 0), protected, **kwargs)]
+        return '\n'.join(kept)
+
+    def document_count(self):
+        return self.conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+
+    def close(self):
+        self.conn.close()
+
+def read_files(paths):
+    """Read raw job description text files"""
+    texts = []
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            texts.append(f.read())
+    return texts
+
+def savings_report(index, texts):
+    """Average token savings of boilerplate stripping over a set of postings"""
+    before = [estimate_tokens(' '.join(t.split())) for t in texts]
+    after = [estimate_tokens(' '.join(index.strip(t).split())) for t in texts]
+    saved = sum(before) - sum(after)
+    return {
+        "documents": len(texts),
+        "avg_tokens_before": sum(before) / len(texts) if texts else 0,
+        "avg_tokens_after": sum(after) / len(texts) if texts else 0,
+        "avg_tokens_saved": saved / len(texts) if texts else 0,
+        "percent_saved": round(100 * saved / sum(before), 2) if sum(before) else 0
+    }
+
+def flatten_skills(skills):
+    """Collect lowercase skill strings from an extraction result"""
+    items = set()
+    for value in skills.values():
+        if isinstance(value, list):
+            items.update(str(v).strip().lower() for v in value)
+        elif isinstance(value, dict):
+            items.update(flatten_skills(value))
+        elif isinstance(value, str):
+            items.add(value.strip().lower())
+    return items
+
+def extraction_failed(skills):
+    """Error message if extract_skills returned an error or unparsed text instead of skills"""
+    if "error" in skills:
+        return str(skills["error"])
+    if "raw_response" in skills:
+        return "unparsed response"
+    return None
+
+def evaluate_extraction(index, texts):
+    """
+    Compare skill extraction on raw vs stripped postings (recall of raw skills).
+    Postings where either extraction failed are reported but left out of the average.
+    """
+    from skill_extractor import extract_skills
+
+    results = []
+    for text in texts:
+        raw = extract_skills(' '.join(text.split()))
+        stripped = extract_skills(' '.join(index.strip(text).split()))
+        failure = extraction_failed(raw) or extraction_failed(stripped)
+        if failure:
+            results.append({"skipped": failure})
+            continue
+        raw_skills, stripped_skills = flatten_skills(raw), flatten_skills(stripped)
+        recall = len(raw_skills & stripped_skills) / len(raw_skills) if raw_skills else 1.0
+        results.append({
+            "raw_skills": len(raw_skills),
+            "stripped_skills": len(stripped_skills),
+            "recall": round(recall, 3)
+        })
+    compared = [r for r in results if "recall" in r]
+    return {
+        "documents": results,
+        "compared": len(compared),
+        "skipped": len(results) - len(compared),
+        "avg_recall": round(sum(r["recall"] for r in compared) / len(compared), 3) if compared else None
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build and apply the JD boilerplate index")
+    parser.add_argument("files", nargs="+", help="Job description text files")
+    parser.add_argument("--index", default=BOILERPLATE_INDEX_PATH, help="Path to boilerplate index database")
+    parser.add_argument("--add", action="store_true", help="Add the files to the index")
+    parser.add_argument("--report", action="store_true", help="Print average token savings for the files")
+    parser.add_argument("--evaluate", action="store_true", help="Compare skill extraction on raw vs stripped versions of the given files (uses the LLM)")
+
+    args = parser.parse_args()
+
+    try:
+        index = BoilerplateIndex(args.index)
+        texts = read_files(args.files)
+
+        if args.add:
+            added = sum(index.add_document(t) for t in texts)
+            print(f"Indexed {added} new documents ({index.document_count()} total) in {args.index}")
+        if args.report:
+            print(json.dumps(savings_report(index, texts), indent=2))
+        if args.evaluate:
+            print(json.dumps(evaluate_extraction(index, texts), indent=2))
+        if not (args.add or args.report or args.evaluate):
+            for text in texts:
+                print(index.strip(text))
+
+    except Exception as e:
+        print(f"Error: {str(e)}")
+        sys.exit(1)
@@ -0,0 +1,85 @@
+"""
+Self-check for corpus-level boilerplate stripping.
+
+    python check_boilerplate_filter.py
+
+Runs in a temporary directory with its own index; exits non-zero on failure.
+"""
+import os
+import sys
+import tempfile
+
+# Must be set before config is imported; OUTPUT_DIR is relative to the working directory
+WORK_DIR = tempfile.mkdtemp(prefix="boilerplate_check_")
+os.environ["LLM_BACKEND"] = "fake"
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+JD_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "jd.txt")
+os.chdir(WORK_DIR)
+
+from boilerplate_filter import BoilerplateIndex, split_sentences
+
+EEO = ("We are an equal opportunity employer and all qualified applicants will receive consideration "
+       "for employment without regard to race, color, religion, sex, national origin or disability.")
+SHARED_REQUIREMENT = ("- Experience designing and operating distributed backend services that handle "
+                      "millions of requests per day.")
+EMPLOYERS = {
+    "Acme Data": "We help retailers forecast demand with streaming analytics across thousands of stores.",
+    "Bluebird Bank": "Our mobile banking app is used daily by millions of people to manage their savings.",
+    "Northwind Health": "We protect patient records across a network of hospitals and partner clinics.",
+    "Orbit Games": "We run matchmaking and leaderboards for multiplayer titles played around the world.",
+}
+
+def posting(employer):
+    return "\n".join([
+        "About us",
+        f"{employer} is hiring a backend engineer.",
+        EMPLOYERS[employer],
+        "Requirements",
+        "- Strong communication skills",
+        "- Python",
+        "- SQL",
+        SHARED_REQUIREMENT,
+        "Benefits",
+        EEO,
+    ])
+
+def new_index(name):
+    return BoilerplateIndex(os.path.join(WORK_DIR, f"{name}.db"))
+
+def check_bullets_keep_requirement_section():
+    """Short bullets are not headings, so protection holds for the whole section"""
+    protected = dict(split_sentences(posting("Acme Data")))
+    assert protected["- Python"] and protected[SHARED_REQUIREMENT], "short bullets reset requirement protection"
+    assert not protected[EEO], "protection must end at the next heading"
+
+def check_shared_requirement_kept():
+    """A requirement repeated across employers survives; the shared EEO statement does not"""
+    index = new_index("requirements")
+    for employer in EMPLOYERS:
+        index.add_document(posting(employer))
+    stripped = index.strip(posting("Orbit Games"))
+    assert SHARED_REQUIREMENT in stripped, stripped
+    assert EEO not in stripped, stripped
+
+def check_reposts_count_once():
+    """The same role reposted per location is one cluster, so nothing is stripped"""
+    with open(JD_PATH, 'r', encoding='utf-8') as f:
+        jd = f.read()
+    index = new_index("reposts")
+    reposts = [f"Location: City {n}\n{jd}" for n in range(4)]
+    for text in reposts:
+        index.add_document(text)
+    assert index.strip(reposts[-1]).split() == reposts[-1].split()
+
+if __name__ == "__main__":
+    checks = [check_bullets_keep_requirement_section, check_shared_requirement_kept, check_reposts_count_once]
+    failed = 0
+    for check in checks:
+        try:
+            check()
+            print(f"OK    {check.__name__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"FAIL  {check.__name__}: {e}")
+    print(f"Work directory: {WORK_DIR}")
+    sys.exit(1 if failed else 0)
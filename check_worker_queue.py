@@ -0,0 +1,158 @@
+"""
+Self-check for the worker queue on a single machine with the fake LLM backend.
+
+    python check_worker_queue.py
+
+Runs in a temporary directory with its own queue database; exits non-zero on failure.
+"""
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+# Must be set before config is imported; OUTPUT_DIR is relative to the working directory
+WORK_DIR = tempfile.mkdtemp(prefix="worker_queue_check_")
+os.environ["LLM_BACKEND"] = "fake"
+os.environ["BOILERPLATE_INDEX_PATH"] = os.path.join(WORK_DIR, "boilerplate_index.db")
+os.environ["QUOTA_REQUESTS"] = "1000"
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.chdir(WORK_DIR)
+
+import worker_queue
+from worker_queue import JobQueue, LeaseKeeper, QuotaCoordinator, run_workers
+from config import QUOTA_WINDOW, WORKER_MAX_ATTEMPTS
+
+def new_db(name):
+    return os.path.join(WORK_DIR, f"{name}.db")
+
+def check_lease_takeover():
+    """A job whose worker died is leased again once its lease expires"""
+    queue = JobQueue(new_db("takeover"))
+    job_id = queue.enqueue(job_description="Backend engineer")
+    assert queue.lease("dead-worker", lease_seconds=60)["id"] == job_id
+    assert queue.lease("other-worker") is None, "live lease must not be taken over"
+
+    queue.conn.execute("UPDATE jobs SET lease_expires = 0 WHERE id = ?", (job_id,))
+    job = queue.lease("other-worker")
+    assert job["id"] == job_id and job["attempts"] == 2
+    assert not queue.ack(job_id, "dead-worker", "out"), "stale worker must not ack"
+    assert queue.ack(job_id, "other-worker", "out")
+    assert queue.status() == {"done": 1}
+
+def check_enqueue_snapshot():
+    """A queued file's text is stored, so deleting the file doesn't change the job"""
+    queue = JobQueue(new_db("snapshot"))
+    jd_file = os.path.join(WORK_DIR, "snapshot_jd.txt")
+    with open(jd_file, 'w', encoding='utf-8') as f:
+        f.write("Data engineer")
+    job_id = queue.enqueue(jd_file=jd_file)
+    os.remove(jd_file)
+
+    job = queue.lease("worker")
+    assert job["id"] == job_id and job["job_description"] == "Data engineer", job
+    assert job["jd_file"] == jd_file
+
+def check_max_attempts():
+    """Jobs fail after WORKER_MAX_ATTEMPTS expired leases or nacks"""
+    queue = JobQueue(new_db("attempts"))
+    expired_id = queue.enqueue(job_description="Expires every time")
+    for attempt in range(WORKER_MAX_ATTEMPTS):
+        assert queue.lease(f"dead-{attempt}", lease_seconds=0)["id"] == expired_id
+    nacked_id = queue.enqueue(job_description="Fails every time")
+    for attempt in range(WORKER_MAX_ATTEMPTS):
+        job = queue.lease(f"worker-{attempt}")
+        assert job["id"] == nacked_id
+        queue.nack(nacked_id, f"worker-{attempt}", "boom")
+
+    assert queue.lease("late-worker") is None
+    rows = dict(queue.conn.execute("SELECT id, status FROM jobs").fetchall())
+    assert rows == {expired_id: "failed", nacked_id: "failed"}, rows
+
+def check_quota_split():
+    """The per-model budget is split across leased workers over a sliding window"""
+    db_path = new_db("quota")
+    worker_queue.QUOTA_LIMITS["check-model"] = {"requests": 4, "tokens": 1000}
+    queue = JobQueue(db_path)
+    for name in ("w1", "w2"):
+        queue.enqueue(job_description=name)
+        queue.lease(name)
+    w1, w2 = QuotaCoordinator("w1", db_path), QuotaCoordinator("w2", db_path)
+
+    # Two active workers: two requests each
+    assert w1.try_acquire("check-model", 10) and w1.try_acquire("check-model", 10)
+    assert w1.try_acquire("check-model", 10) is None, "w1 exceeded its share"
+    assert w2.try_acquire("check-model", 10) and w2.try_acquire("check-model", 10)
+    assert w2.try_acquire("check-model", 10) is None, "total budget exceeded"
+
+    # Response tokens count against the token budget
+    event_id = w1.try_acquire("other-model", 10)
+    w1.record_response(event_id, 500)
+    assert w1.conn.execute("SELECT tokens FROM quota_events WHERE id = ?", (event_id,)).fetchone()[0] == 510
+
+    # Requests older than the sliding window free their slots
+    queue.conn.execute("UPDATE quota_events SET sent_at = sent_at - ? WHERE worker_id = 'w1'", (QUOTA_WINDOW + 1,))
+    assert w1.try_acquire("check-model", 10) is not None
+
+def check_end_to_end():
+    """Several worker processes drain the queue through the fake backend"""
+    db_path = new_db("e2e")
+    queue = JobQueue(db_path)
+    for n in range(4):
+        queue.enqueue(job_description=f"About the role\nEngineer {n} builds service {n}.\nResponsibilities\nShip feature {n}.")
+    queue.close()
+
+    run_workers(3, db_path)
+
+    queue = JobQueue(db_path)
+    assert queue.status() == {"done": 4}, queue.status()
+    for (output_dir,) in queue.conn.execute("SELECT output_dir FROM jobs"):
+        assert os.path.exists(os.path.join(output_dir, "final_roadmap.json")), output_dir
+        assert output_dir.endswith("_attempt1"), output_dir
+
+def check_lease_keeper():
+    """The keeper retries renewals after a locked database and stops once the lease is lost"""
+    db_path = new_db("keeper")
+    queue = JobQueue(db_path)
+    job_id = queue.enqueue(job_description="Keeper")
+    queue.lease("w1", lease_seconds=60)
+
+    renew, calls = JobQueue.renew, []
+    def flaky_renew(self, *args, **kwargs):
+        calls.append(1)
+        if len(calls) == 1:
+            raise sqlite3.OperationalError("database is locked")
+        return renew(self, *args, **kwargs)
+
+    saved = worker_queue.WORKER_LEASE_SECONDS, worker_queue.WORKER_POLL_INTERVAL
+    JobQueue.renew = flaky_renew
+    worker_queue.WORKER_LEASE_SECONDS, worker_queue.WORKER_POLL_INTERVAL = 0.3, 0.05
+    try:
+        keeper = LeaseKeeper(db_path, job_id, "w1")
+        keeper.start()
+        time.sleep(0.4)
+        keeper.stop()
+        assert len(calls) >= 2, "keeper did not retry after OperationalError"
+        expires = queue.conn.execute("SELECT lease_expires FROM jobs WHERE id = ?", (job_id,)).fetchone()[0]
+        assert expires > time.time() + 60, "lease was not renewed"
+
+        stale = LeaseKeeper(db_path, job_id, "w2")
+        stale.start()
+        stale.join(timeout=1)
+        assert not stale.is_alive(), "keeper kept running without the lease"
+    finally:
+        JobQueue.renew = renew
+        worker_queue.WORKER_LEASE_SECONDS, worker_queue.WORKER_POLL_INTERVAL = saved
+
+if __name__ == "__main__":
+    checks = [check_lease_takeover, check_enqueue_snapshot, check_max_attempts, check_quota_split, check_lease_keeper, check_end_to_end]
+    failed = 0
+    for check in checks:
+        try:
+            check()
+            print(f"OK    {check.__name__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"FAIL  {check.__name__}: {e}")
+    print(f"Work directory: {WORK_DIR}")
+    sys.exit(1 if failed else 0)
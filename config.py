@@ -10,6 +10,10 @@ GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 # Use gemini-1.5-flash which has better performance in the free tier
 MODEL_NAME = os.getenv("MODEL_NAME", "gemini-1.5-flash")
 EVAL_MODEL_NAME = os.getenv("EVAL_MODEL_NAME", "gemini-1.5-flash")
+# "gemini" calls the API, "fake" returns canned responses for offline runs
+LLM_BACKEND = os.getenv("LLM_BACKEND", "gemini").lower()
+if LLM_BACKEND not in ("gemini", "fake"):
+    raise ValueError(f"Unsupported LLM_BACKEND: {LLM_BACKEND} (expected 'gemini' or 'fake')")
 
 # System Parameters
 MAX_TOKENS = 2048  # Reduced to lower token usage
@@ -21,10 +25,34 @@ MIN_DELAY_BETWEEN_REQUESTS = 3  # seconds between API calls
 MAX_RETRIES = 3
 RETRY_DELAY = 5  # initial seconds to wait before retry (will increase exponentially)
 
+# Shared quota per model over a sliding window, split fairly across queue workers
+QUOTA_WINDOW = 60  # seconds
+# Per-model overrides, e.g. {"gemini-1.5-pro": {"requests": 2, "tokens": 32000}}
+QUOTA_LIMITS = {}
+DEFAULT_QUOTA = {
+    "requests": int(os.getenv("QUOTA_REQUESTS", 15)),
+    "tokens": int(os.getenv("QUOTA_TOKENS", 1000000)),
+}
+
+# Q&A Settings
+QA_BATCH_SIZE = 5  # questions packed into a single LLM call in --questions-file mode
+
 # Path configurations
 OUTPUT_DIR = "outputs"
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
+# Worker Queue Settings
+WORKER_DB_PATH = os.getenv("WORKER_DB_PATH", os.path.join(OUTPUT_DIR, "worker_queue.db"))
+WORKER_LEASE_SECONDS = 300  # a job whose lease is not renewed in time is handed to another worker
+WORKER_MAX_ATTEMPTS = 3
+WORKER_POLL_INTERVAL = 1  # seconds between queue polls / quota checks
+
+# Boilerplate Filter Settings
+BOILERPLATE_INDEX_PATH = os.getenv("BOILERPLATE_INDEX_PATH", os.path.join(OUTPUT_DIR, "boilerplate_index.db"))
+BOILERPLATE_MIN_DOCS = 3  # a sentence seen in this many other postings is treated as boilerplate
+BOILERPLATE_MIN_WORDS = 10  # shorter sentences (e.g. requirement bullets) are never stripped
+BOILERPLATE_DUPLICATE_SIMILARITY = 0.7  # postings at least this similar (MinHash Jaccard) count as one
+
 def rate_limit():
     """Simple function to enforce delay between API calls"""
     time.sleep(MIN_DELAY_BETWEEN_REQUESTS)
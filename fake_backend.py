@@ -0,0 +1,36 @@
+import json
+import re
+
+# Canned responses for offline runs (LLM_BACKEND=fake), keyed by the step passed to generate_content
+FAKE_RESPONSES = {
+    "skills": {
+        "Technical Skills": ["Fake skill"],
+        "Soft Skills": [],
+        "Domain-Specific Skills": [],
+        "Certifications": [],
+        "Experience Requirements": []
+    },
+    "roadmap": {
+        "Foundation Phase": {"skills": ["Fake skill"], "estimated_time": "1 week"}
+    },
+    "evaluation": {
+        "evaluation": "Fake evaluation.",
+        "suggested_improvements": ["Fake improvement."],
+        "improved_roadmap": {"Foundation Phase": {"skills": ["Fake skill"], "estimated_time": "1 week"}}
+    },
+    "qa": "Fake answer."
+}
+
+NUMBERED_QUESTION = re.compile(r'^\s*(\d+)\. ', re.M)
+
+def fake_generate_content(step, prompt):
+    """Return the canned response for a step; unknown steps fail loudly"""
+    if step == "qa_batch":
+        ids = NUMBERED_QUESTION.findall(prompt)
+        if not ids:
+            raise ValueError("Fake backend found no numbered questions in qa_batch prompt")
+        return json.dumps({"answers": [{"id": int(i), "answer": FAKE_RESPONSES["qa"]} for i in ids]})
+    if step not in FAKE_RESPONSES:
+        raise ValueError(f"Fake backend has no response for step: {step}")
+    response = FAKE_RESPONSES[step]
+    return response if isinstance(response, str) else json.dumps(response)
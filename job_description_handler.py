@@ -3,15 +3,19 @@ import json
 import os
 import sys
 from pathlib import Path
+from boilerplate_filter import BoilerplateIndex
 
-def clean_job_description(text):
+def clean_job_description(text, index=None):
     """Clean and format job description text"""
+    # Drop sentences that recur across the JD corpus (marketing, EEO, benefits)
+    if index is not None:
+        text = index.strip(text)
     # Remove extra whitespace
     text = ' '.join(text.split())
     # Basic normalization
     return text.strip()
 
-def process_job_description(input_text=None, input_file=None):
+def process_job_description(input_text=None, input_file=None, strip_boilerplate=True):
     """Process job description from text or file"""
     if input_file and os.path.exists(input_file):
         with open(input_file, 'r', encoding='utf-8') as file:
@@ -21,11 +25,21 @@ def process_job_description(input_text=None, input_file=None):
     else:
         raise ValueError("Either input_text or input_file must be provided")
     
-    cleaned_jd = clean_job_description(job_desc)
+    if strip_boilerplate:
+        index = BoilerplateIndex()
+        try:
+            # Keep the corpus index growing with every posting we see
+            index.add_document(job_desc)
+            cleaned_jd = clean_job_description(job_desc, index)
+        finally:
+            index.close()
+    else:
+        cleaned_jd = clean_job_description(job_desc)
     return {
         "job_description": cleaned_jd,
         "word_count": len(cleaned_jd.split()),
-        "char_count": len(cleaned_jd)
+        "char_count": len(cleaned_jd),
+        "original_char_count": len(' '.join(job_desc.split()))
     }
 
 def save_output(output_data, output_path=None):
@@ -43,6 +57,7 @@ if __name__ == "__main__":
     parser.add_argument("--input", "-i", help="Input job description text")
     parser.add_argument("--file", "-f", help="Path to job description file")
     parser.add_argument("--output", "-o", help="Output file path")
+    parser.add_argument("--keep-boilerplate", action="store_true", help="Do not strip corpus-level boilerplate sentences")
     
     args = parser.parse_args()
     
@@ -51,7 +66,7 @@ if __name__ == "__main__":
         sys.exit(1)
     
     try:
-        result = process_job_description(args.input, args.file)
+        result = process_job_description(args.input, args.file, strip_boilerplate=not args.keep_boilerplate)
         output = save_output(result, args.output)
         print(output)
     except Exception as e:
@@ -18,10 +18,17 @@ def create_session_folder():
     """Create a new session folder with timestamp"""
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     session_dir = os.path.join(OUTPUT_DIR, f"session_{timestamp}")
-    os.makedirs(session_dir, exist_ok=True)
-    return session_dir
+    # Parallel runs can start within the same second; never share a folder
+    suffix = 1
+    while True:
+        try:
+            os.makedirs(session_dir)
+            return session_dir
+        except FileExistsError:
+            session_dir = os.path.join(OUTPUT_DIR, f"session_{timestamp}_{suffix}")
+            suffix += 1
 
-def run_pipeline(job_description=None, jd_file=None, output_dir=None, interactive=False):
+def run_pipeline(job_description=None, jd_file=None, output_dir=None, interactive=False, step_delay=MIN_DELAY_BETWEEN_REQUESTS):
     """Run the complete pipeline from job description to roadmap"""
     
     # Create session folder if output_dir not specified
@@ -58,7 +65,7 @@ def run_pipeline(job_description=None, jd_file=None, output_dir=None, interactiv
     print(f"Skills extracted and saved to {skills_path}")
     
     # Add delay between API calls
-    time.sleep(MIN_DELAY_BETWEEN_REQUESTS)
+    time.sleep(step_delay)
     
     # Step 3: Generate roadmap
     print("\n[3/4] Generating learning roadmap...")
@@ -88,7 +95,7 @@ def run_pipeline(job_description=None, jd_file=None, output_dir=None, interactiv
     print(f"Roadmap generated and saved to {roadmap_path}")
     
     # Add delay between API calls
-    time.sleep(MIN_DELAY_BETWEEN_REQUESTS)
+    time.sleep(step_delay)
     
     # Step 4: Evaluate and improve the roadmap
     print("\n[4/4] Evaluating and improving the roadmap...")
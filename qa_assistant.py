@@ -2,11 +2,13 @@ import argparse
 import json
 import os
 import sys
-from api_utils import generate_content
-from config import MODEL_NAME, TEMPERATURE
+from api_utils import generate_content, parse_json_response
+from config import MODEL_NAME, TEMPERATURE, QA_BATCH_SIZE
 
-def answer_question(question, roadmap, skills=None):
-    """Answer questions about the roadmap and skills"""
+SYSTEM_INSTRUCTION = "You are a helpful career guidance assistant that provides advice based on learning roadmaps and skill requirements."
+
+def build_context(roadmap, skills=None):
+    """Serialize roadmap and optional skills into the prompt context"""
     
     # Convert to string if they're dictionaries
     roadmap_text = json.dumps(roadmap, indent=2) if isinstance(roadmap, dict) else roadmap
@@ -14,12 +16,20 @@ def answer_question(question, roadmap, skills=None):
     if skills:
         skills_text = f"\nExtracted Skills:\n{json.dumps(skills, indent=2)}" if isinstance(skills, dict) else f"\nExtracted Skills:\n{skills}"
     
-    prompt = f"""
+    return f"""
     Based on this learning roadmap:{skills_text}
     
     Roadmap:
     {roadmap_text}
+    """
+
+def answer_question(question, roadmap, skills=None, context=None):
+    """Answer questions about the roadmap and skills"""
+    
+    if context is None:
+        context = build_context(roadmap, skills)
     
+    prompt = f"""{context}
     Please answer this question:
     {question}
     
@@ -27,13 +37,12 @@ def answer_question(question, roadmap, skills=None):
     """
     
     try:
-        system_instruction = "You are a helpful career guidance assistant that provides advice based on learning roadmaps and skill requirements."
-        
         result = generate_content(
             model_name=MODEL_NAME,
             prompt=prompt,
-            system_instruction=system_instruction,
-            temperature=TEMPERATURE
+            system_instruction=SYSTEM_INSTRUCTION,
+            temperature=TEMPERATURE,
+            step="qa"
         )
         
         return {
@@ -42,7 +51,71 @@ def answer_question(question, roadmap, skills=None):
         }
             
     except Exception as e:
-        return {"error": str(e)}
+        return {"question": question, "error": str(e)}
+
+def answer_question_batch(questions, context):
+    """Answer several questions in a single LLM call, keyed by question id"""
+    
+    numbered = "\n".join(f"{i}. {q}" for i, q in enumerate(questions, 1))
+    prompt = f"""{context}
+    Please answer each of these questions:
+    {numbered}
+    
+    Provide a clear, helpful response to each question directly.
+    Format your response as a JSON object with an "answers" key holding a list of
+    objects with "id" (the question number) and "answer" (your response).
+    """
+    
+    try:
+        result = generate_content(
+            model_name=MODEL_NAME,
+            prompt=prompt,
+            system_instruction=SYSTEM_INSTRUCTION,
+            temperature=TEMPERATURE,
+            step="qa_batch"
+        )
+    except Exception as e:
+        return [{"question": q, "error": str(e)} for q in questions]
+    
+    answers = {}
+    parsed = parse_json_response(result)
+    for item in parsed.get("answers", []) if isinstance(parsed, dict) else []:
+        if isinstance(item, dict) and "answer" in item:
+            answers[str(item.get("id"))] = item["answer"]
+    
+    missing = [i for i in range(1, len(questions) + 1) if str(i) not in answers]
+    if missing:
+        print(f"Warning: batched response had no answer for question(s) {missing}; asking them one by one", file=sys.stderr)
+    
+    responses = []
+    for i, question in enumerate(questions, 1):
+        if str(i) in answers:
+            responses.append({"question": question, "answer": answers[str(i)]})
+        else:
+            responses.append(answer_question(question, None, context=context))
+    return responses
+
+def answer_questions(questions, roadmap, skills=None, batch_size=QA_BATCH_SIZE):
+    """Answer many questions against one roadmap, packing them into batched calls"""
+    if batch_size < 1:
+        raise ValueError("batch_size must be at least 1")
+    
+    # Serialize the roadmap context once for the whole run
+    context = build_context(roadmap, skills)
+    responses = []
+    for start in range(0, len(questions), batch_size):
+        batch = questions[start:start + batch_size]
+        print(f"Answering questions {start + 1}-{start + len(batch)} of {len(questions)}...", file=sys.stderr)
+        responses.extend(answer_question_batch(batch, context))
+    return responses
+
+def load_questions(questions_file):
+    """Load one question per line, skipping blank lines"""
+    if not os.path.exists(questions_file):
+        raise FileNotFoundError(f"Questions file not found: {questions_file}")
+    
+    with open(questions_file, 'r', encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip()]
 
 def load_input(roadmap_file, skills_file=None):
     """Load roadmap and optional skills from input files"""
@@ -86,15 +159,33 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Q&A Assistant for learning roadmap")
     parser.add_argument("--roadmap", "-r", required=True, help="Path to roadmap JSON file")
     parser.add_argument("--skills", "-s", help="Path to skills JSON file (optional)")
-    parser.add_argument("--question", "-q", help="Single question to answer (optional)")
-    parser.add_argument("--output", "-o", help="Output file path (for single question mode)")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--question", "-q", help="Single question to answer (optional)")
+    mode.add_argument("--questions-file", help="File with one question per line, blank lines ignored, to answer in batches (optional)")
+    parser.add_argument("--batch-size", type=int, default=QA_BATCH_SIZE, help="Questions packed into each LLM call (for questions file mode)")
+    parser.add_argument("--output", "-o", help="Output file path (JSON for single question mode, JSONL for questions file mode)")
     
     args = parser.parse_args()
     
+    if args.batch_size < 1:
+        parser.error("--batch-size must be at least 1")
+    
     try:
         roadmap, skills = load_input(args.roadmap, args.skills)
         
-        if args.question:
+        if args.questions_file:
+            # Batched questions mode
+            questions = load_questions(args.questions_file)
+            responses = answer_questions(questions, roadmap, skills, batch_size=args.batch_size)
+            lines = "".join(json.dumps(r) + "\n" for r in responses)
+            
+            if args.output:
+                with open(args.output, 'w', encoding='utf-8') as f:
+                    f.write(lines)
+                print(f"{len(responses)} answers saved to {args.output}")
+            else:
+                print(lines, end="")
+        elif args.question:
             # Single question mode
             response = answer_question(args.question, roadmap, skills)
             
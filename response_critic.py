@@ -44,7 +44,8 @@ def evaluate_roadmap(roadmap, original_skills):
             model_name=EVAL_MODEL_NAME,
             prompt=prompt, 
             system_instruction=system_instruction,
-            temperature=EVAL_TEMPERATURE
+            temperature=EVAL_TEMPERATURE,
+            step="evaluation"
         )
         
         return parse_json_response(result)
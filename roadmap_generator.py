@@ -50,7 +50,8 @@ def generate_roadmap(skills):
             model_name=MODEL_NAME,
             prompt=prompt,
             system_instruction=system_instruction,
-            temperature=TEMPERATURE
+            temperature=TEMPERATURE,
+            step="roadmap"
         )
         
         return parse_json_response(result)
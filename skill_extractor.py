@@ -31,7 +31,8 @@ def extract_skills(job_description):
             model_name=MODEL_NAME,
             prompt=prompt,
             system_instruction=system_instruction,
-            temperature=TEMPERATURE
+            temperature=TEMPERATURE,
+            step="skills"
         )
         
         return parse_json_response(result)
@@ -0,0 +1,318 @@
+import argparse
+import contextlib
+import json
+import math
+import multiprocessing
+import os
+import socket
+import sqlite3
+import sys
+import threading
+import time
+from config import (OUTPUT_DIR, WORKER_DB_PATH, WORKER_LEASE_SECONDS, WORKER_MAX_ATTEMPTS,
+                    WORKER_POLL_INTERVAL, QUOTA_WINDOW, QUOTA_LIMITS, DEFAULT_QUOTA)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_description TEXT,
+    jd_file TEXT,
+    status TEXT NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    lease_owner TEXT,
+    lease_expires REAL,
+    output_dir TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, id);
+CREATE TABLE IF NOT EXISTS quota_events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    model TEXT NOT NULL,
+    worker_id TEXT NOT NULL,
+    sent_at REAL NOT NULL,
+    tokens INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS quota_events_model ON quota_events (model, sent_at);
+"""
+
+def connect(db_path=WORKER_DB_PATH):
+    """Open the queue database; each process and thread needs its own connection"""
+    directory = os.path.dirname(db_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    conn = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+@contextlib.contextmanager
+def transaction(conn):
+    """Take the database write lock up front so read-then-update is atomic across processes"""
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+class JobQueue:
+    """Durable SQLite job queue with lease/ack semantics"""
+
+    def __init__(self, db_path=WORKER_DB_PATH):
+        self.db_path = db_path
+        self.conn = connect(db_path)
+
+    def enqueue(self, job_description=None, jd_file=None):
+        """
+        Add a job description (text or file path) and return its job id.
+        A file is read now, so later edits or deletion don't change the job; its path is kept as metadata.
+        """
+        if not (job_description or jd_file):
+            raise ValueError("Either job_description or jd_file must be provided")
+        if job_description is None:
+            with open(jd_file, 'r', encoding='utf-8') as f:
+                job_description = f.read()
+        now = time.time()
+        cursor = self.conn.execute(
+            "INSERT INTO jobs (job_description, jd_file, created_at, updated_at) VALUES (?, ?, ?, ?)",
+            (job_description, jd_file and os.path.abspath(jd_file), now, now))
+        return cursor.lastrowid
+
+    def lease(self, worker_id, lease_seconds=WORKER_LEASE_SECONDS):
+        """Claim the next queued job, or one whose previous worker crashed"""
+        while True:
+            now = time.time()
+            with transaction(self.conn):
+                job = self.conn.execute(
+                    "SELECT * FROM jobs WHERE status = 'queued' "
+                    "OR (status = 'leased' AND lease_expires < ?) ORDER BY id LIMIT 1", (now,)).fetchone()
+                if job is None:
+                    return None
+                if job["attempts"] >= WORKER_MAX_ATTEMPTS:
+                    self.conn.execute(
+                        "UPDATE jobs SET status = 'failed', error = COALESCE(error, 'lease expired'), "
+                        "lease_owner = NULL, updated_at = ? WHERE id = ?", (now, job["id"]))
+                    continue
+                self.conn.execute(
+                    "UPDATE jobs SET status = 'leased', attempts = attempts + 1, lease_owner = ?, "
+                    "lease_expires = ?, updated_at = ? WHERE id = ?",
+                    (worker_id, now + lease_seconds, now, job["id"]))
+                return dict(job, attempts=job["attempts"] + 1)
+
+    def renew(self, job_id, worker_id, lease_seconds=WORKER_LEASE_SECONDS):
+        """Extend a lease; returns False if the job was handed to another worker"""
+        now = time.time()
+        cursor = self.conn.execute(
+            "UPDATE jobs SET lease_expires = ?, updated_at = ? "
+            "WHERE id = ? AND lease_owner = ? AND status = 'leased'",
+            (now + lease_seconds, now, job_id, worker_id))
+        return cursor.rowcount == 1
+
+    def ack(self, job_id, worker_id, output_dir):
+        """Mark a leased job as done"""
+        cursor = self.conn.execute(
+            "UPDATE jobs SET status = 'done', output_dir = ?, error = NULL, lease_owner = NULL, "
+            "updated_at = ? WHERE id = ? AND lease_owner = ? AND status = 'leased'",
+            (output_dir, time.time(), job_id, worker_id))
+        return cursor.rowcount == 1
+
+    def nack(self, job_id, worker_id, error):
+        """Release a failed job for retry, or fail it once attempts are used up"""
+        cursor = self.conn.execute(
+            "UPDATE jobs SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'queued' END, "
+            "error = ?, lease_owner = NULL, lease_expires = NULL, updated_at = ? "
+            "WHERE id = ? AND lease_owner = ? AND status = 'leased'",
+            (WORKER_MAX_ATTEMPTS, error, time.time(), job_id, worker_id))
+        return cursor.rowcount == 1
+
+    def pending(self):
+        """Number of jobs not yet done or failed"""
+        return self.conn.execute(
+            "SELECT COUNT(*) FROM jobs WHERE status IN ('queued', 'leased')").fetchone()[0]
+
+    def status(self):
+        """Job counts by status"""
+        rows = self.conn.execute("SELECT status, COUNT(*) AS count FROM jobs GROUP BY status").fetchall()
+        return {row["status"]: row["count"] for row in rows}
+
+    def close(self):
+        self.conn.close()
+
+class QuotaCoordinator:
+    """
+    Per-model request/token budget shared through the queue database.
+    Usage is counted over a sliding QUOTA_WINDOW (one row per request), so there is
+    no burst at window boundaries. The budget is split evenly across workers
+    currently holding a lease.
+    """
+
+    def __init__(self, worker_id, db_path=WORKER_DB_PATH):
+        self.worker_id = worker_id
+        self.conn = connect(db_path)
+
+    def try_acquire(self, model_name, tokens):
+        """Record one request if it fits the shared budget; returns its event id or None"""
+        limit = QUOTA_LIMITS.get(model_name, DEFAULT_QUOTA)
+        now = time.time()
+        since = now - QUOTA_WINDOW
+        with transaction(self.conn):
+            self.conn.execute("DELETE FROM quota_events WHERE sent_at <= ?", (since,))
+            total = self.conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(tokens), 0) FROM quota_events WHERE model = ? AND sent_at > ?",
+                (model_name, since)).fetchone()
+            mine = self.conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(tokens), 0) FROM quota_events "
+                "WHERE model = ? AND sent_at > ? AND worker_id = ?",
+                (model_name, since, self.worker_id)).fetchone()
+            active = self.conn.execute(
+                "SELECT COUNT(DISTINCT lease_owner) FROM jobs WHERE status = 'leased' AND lease_expires > ?",
+                (now,)).fetchone()[0]
+            active = max(active, 1)
+            share_requests = math.ceil(limit["requests"] / active)
+            share_tokens = math.ceil(limit["tokens"] / active)
+
+            # A request larger than the whole share is still let through on an idle window
+            fits_total = total[0] < limit["requests"] and (total[1] + tokens <= limit["tokens"] or total[0] == 0)
+            fits_share = mine[0] < share_requests and (mine[1] + tokens <= share_tokens or mine[0] == 0)
+            if not (fits_total and fits_share):
+                return None
+            cursor = self.conn.execute(
+                "INSERT INTO quota_events (model, worker_id, sent_at, tokens) VALUES (?, ?, ?, ?)",
+                (model_name, self.worker_id, now, tokens))
+            return cursor.lastrowid
+
+    def acquire(self, model_name, tokens):
+        """Block until this worker may send one request of the given size"""
+        while True:
+            event_id = self.try_acquire(model_name, tokens)
+            if event_id is not None:
+                return event_id
+            time.sleep(WORKER_POLL_INTERVAL)
+
+    def record_response(self, event_id, tokens):
+        """Add the response's tokens to the request's usage"""
+        self.conn.execute("UPDATE quota_events SET tokens = tokens + ? WHERE id = ?", (tokens, event_id))
+
+class LeaseKeeper(threading.Thread):
+    """Renew a job's lease in the background while the pipeline runs"""
+
+    def __init__(self, db_path, job_id, worker_id):
+        super().__init__(daemon=True)
+        self.db_path = db_path
+        self.job_id = job_id
+        self.worker_id = worker_id
+        self.stopped = threading.Event()
+
+    def run(self):
+        queue = None
+        interval = WORKER_LEASE_SECONDS / 3
+        while not self.stopped.wait(interval):
+            try:
+                if queue is None:
+                    queue = JobQueue(self.db_path)
+                if not queue.renew(self.job_id, self.worker_id):
+                    print(f"[{self.worker_id}] Lost lease on job {self.job_id}; another worker may take it over",
+                          file=sys.stderr)
+                    return
+                interval = WORKER_LEASE_SECONDS / 3
+            except sqlite3.OperationalError as e:
+                # e.g. "database is locked": retry well before the lease runs out
+                print(f"[{self.worker_id}] Could not renew lease on job {self.job_id}: {str(e)}; retrying",
+                      file=sys.stderr)
+                interval = WORKER_POLL_INTERVAL
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+def worker_loop(db_path=WORKER_DB_PATH, follow=False):
+    """Pull jobs and run the pipeline until the queue is drained"""
+    # Import here so each worker process sets up its own API client
+    import api_utils
+    from pipeline import run_pipeline
+
+    worker_id = f"{socket.gethostname()}-{os.getpid()}"
+    queue = JobQueue(db_path)
+    api_utils.set_rate_limiter(QuotaCoordinator(worker_id, db_path))
+
+    while True:
+        job = queue.lease(worker_id)
+        if job is None:
+            if not follow and queue.pending() == 0:
+                return
+            time.sleep(WORKER_POLL_INTERVAL)
+            continue
+
+        # Per attempt, so a worker taking over an expired lease never writes into a live run's folder
+        output_dir = os.path.join(OUTPUT_DIR, "jobs", f"job_{job['id']}_attempt{job['attempts']}")
+        os.makedirs(output_dir, exist_ok=True)
+        print(f"[{worker_id}] Running job {job['id']} (attempt {job['attempts']})")
+
+        keeper = LeaseKeeper(db_path, job["id"], worker_id)
+        keeper.start()
+        try:
+            with open(os.path.join(output_dir, "pipeline.log"), 'a', encoding='utf-8') as log:
+                with contextlib.redirect_stdout(log):
+                    run_pipeline(
+                        job_description=job["job_description"],
+                        output_dir=output_dir,
+                        step_delay=0
+                    )
+            keeper.stop()
+            if queue.ack(job["id"], worker_id, output_dir):
+                print(f"[{worker_id}] Job {job['id']} done: {output_dir}")
+            else:
+                print(f"[{worker_id}] Job {job['id']} finished after its lease was lost; "
+                      f"result in {output_dir} not recorded", file=sys.stderr)
+        except Exception as e:
+            keeper.stop()
+            if queue.nack(job["id"], worker_id, str(e)):
+                print(f"[{worker_id}] Job {job['id']} failed: {str(e)}")
+            else:
+                print(f"[{worker_id}] Job {job['id']} failed after its lease was lost: {str(e)}", file=sys.stderr)
+
+def run_workers(num_workers, db_path=WORKER_DB_PATH, follow=False):
+    """Start worker processes and wait for them to finish"""
+    processes = [multiprocessing.Process(target=worker_loop, args=(db_path, follow))
+                 for _ in range(num_workers)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the pipeline over a durable job queue with parallel workers")
+    parser.add_argument("--enqueue", "-e", nargs="+", metavar="FILE", help="Job description files to add to the queue")
+    parser.add_argument("--workers", "-w", type=int, default=0, help="Number of worker processes to start")
+    parser.add_argument("--follow", action="store_true", help="Keep workers polling for new jobs instead of exiting when the queue is empty")
+    parser.add_argument("--db", default=WORKER_DB_PATH, help="Path to queue database")
+    parser.add_argument("--status", action="store_true", help="Print job counts by status")
+
+    args = parser.parse_args()
+
+    if not (args.enqueue or args.workers or args.status):
+        print("Error: Please provide --enqueue, --workers or --status")
+        sys.exit(1)
+
+    try:
+        queue = JobQueue(args.db)
+        if args.enqueue:
+            for jd_file in args.enqueue:
+                if not os.path.exists(jd_file):
+                    raise FileNotFoundError(f"Input file not found: {jd_file}")
+                print(f"Queued job {queue.enqueue(jd_file=jd_file)}: {jd_file}")
+        if args.workers:
+            # Workers open their own connections; don't carry this one across fork
+            queue.close()
+            run_workers(args.workers, args.db, args.follow)
+            queue = JobQueue(args.db)
+        if args.status:
+            print(json.dumps(queue.status(), indent=2))
+
+    except Exception as e:
+        print(f"Error: {str(e)}")
+        sys.exit(1)